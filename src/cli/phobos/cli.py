@@ -34,26 +34,24 @@ from shlex import shlex
 import errno
 import argparse
 import logging
+import re
 from logging.handlers import SysLogHandler
 
 import os
 import os.path
 
 from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from itertools import zip_longest
 
-from ClusterShell.NodeSet import NodeSet
-
-from phobos.core.admin import Client as AdminClient
 from phobos.core.cfg import load_file as cfg_load_file
 from phobos.core.const import (PHO_LIB_SCSI, rsc_family2str, # pylint: disable=no-name-in-module
                                PHO_RSC_ADM_ST_LOCKED, PHO_RSC_ADM_ST_UNLOCKED)
 from phobos.core.dss import Client as DSSClient
 from phobos.core.ffi import (DeprecatedObjectInfo, DevInfo, LayoutInfo,
                              MediaInfo, ObjectInfo, ResourceFamily)
-from phobos.core.ldm import LibAdapter
 from phobos.core.log import LogControl, DISABLED, WARNING, INFO, VERBOSE, DEBUG
-from phobos.core.store import XferClient, UtilClient, attrs_as_dict, PutParams
-from phobos.output import dump_object_list
 
 def phobos_log_handler(log_record):
     """
@@ -90,32 +88,184 @@ def phobos_log_handler(log_record):
     logger = logging.getLogger(__name__)
     logger.handle(record)
 
+@lru_cache(maxsize=256)
+def errno_str(errnum):
+    """Return the (cached) description of a possibly negative errno value."""
+    return os.strerror(abs(errnum)) if errnum else "(null)"
+
 def env_error_format(exc):
     """Return a human readable representation of an environment exception."""
-    return "%s: %s" % (exc.strerror,
-                       os.strerror(abs(exc.errno)) if exc.errno else "(null)")
+    return "%s: %s" % (exc.strerror, errno_str(exc.errno))
+
+@contextmanager
+def env_error_guard(logger, message, *args):
+    """
+    Log an EnvironmentError raised in the block after `message`, formatted
+    with `args`, and make the CLI exit with os.EX_DATAERR.
+    """
+    try:
+        yield
+    except EnvironmentError as err:
+        logger.error(message + ": %s", *(args + (env_error_format(err),)))
+        sys.exit(os.EX_DATAERR)
+
+def exit_on_env_error(message):
+    """
+    Decorate an action method so that its whole body runs under
+    env_error_guard with `message`.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with env_error_guard(self.logger, "%s", message):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+@lru_cache(maxsize=None)
+def display_keys(resource_cls):
+    """
+    Return the sorted tuple of attributes a CLI managed resource class can
+    display. It is computed once per class from an empty instance.
+    """
+    return tuple(sorted(resource_cls().get_display_dict()))
+
+OUTPUT_WILDCARDS = frozenset(('*', 'all'))
+
+def dump_object_list(objs, **kwargs):
+    """
+    Thin wrapper around phobos.output.dump_object_list: the output module
+    drags yaml, tabulate and xml along, so only load it when something is
+    actually listed.
+    """
+    # pylint: disable=import-outside-toplevel
+    from phobos.output import dump_object_list as _dump_object_list
+    _dump_object_list(objs, **kwargs)
+
+def check_output_attributes(attrs, out_attrs, logger):
+    """
+    Make sure the requested output attributes are among the available ones or
+    the '*'/'all' wildcards, exit with EX_USAGE otherwise. The available
+    attributes are left untouched.
+    """
+    bad_attrs = set(out_attrs).difference(attrs, OUTPUT_WILDCARDS)
+    if bad_attrs:
+        logger.error("Bad output attributes: %s", " ".join(bad_attrs))
+        sys.exit(os.EX_USAGE)
+
+# Admin client (without LRS connection) shared by the actions of the current
+# PhobosActionContext
+_ADMIN_CLIENT = None
+
+def _get_admin():
+    """
+    Return the admin client shared by the actions of the current
+    PhobosActionContext, initializing it on first use. It is released by
+    _release_admin() when the context exits.
+    """
+    global _ADMIN_CLIENT # pylint: disable=global-statement
+    if _ADMIN_CLIENT is None:
+        # pylint: disable=import-outside-toplevel
+        from phobos.core.admin import Client as AdminClient
+        adm = AdminClient(lrs_required=False)
+        adm.init(False)
+        _ADMIN_CLIENT = adm
+
+    return _ADMIN_CLIENT
+
+def _release_admin():
+    """Finalize the shared admin client, if any was initialized."""
+    global _ADMIN_CLIENT # pylint: disable=global-statement
+    adm, _ADMIN_CLIENT = _ADMIN_CLIENT, None
+    if adm is not None:
+        adm.fini()
+
+@lru_cache(maxsize=None)
+def util_client():
+    """
+    Return the client for the store commands without data transfers. It holds
+    no per-call state, so a single instance is shared by all the actions, and
+    the store bindings are only loaded by the actions which use them.
+    """
+    # pylint: disable=import-outside-toplevel
+    from phobos.core.store import UtilClient
+    return UtilClient()
+
+# Characters with a special meaning in ClusterShell node sets (ranges,
+# separators, groups and set operators)
+_NODESET_CHARS = re.compile(r'[][,@!&^\s]')
+
+def nodeset_fromlist(nodes):
+    """
+    Return the ClusterShell NodeSet of the given node strings. ClusterShell is
+    only loaded by the media actions that actually need to expand resources:
+    a single plain name is returned as is.
+    """
+    if len(nodes) == 1 and not _NODESET_CHARS.search(nodes[0]):
+        return list(nodes)
+
+    # pylint: disable=import-outside-toplevel
+    from ClusterShell.NodeSet import NodeSet
+    return NodeSet.fromlist(nodes)
+
+# Characters which need the shell-like lexer to be handled properly
+_LEXER_CHARS = re.compile(r'["\'\\#]')
+_ATTR_SEPARATORS = re.compile(r'[=,]+')
+_LINE_SEPARATORS = re.compile(r' +')
+# Blank and comment lines of a mput file
+_MPUT_SKIP = re.compile(r'\s*(?:#|$)')
+# Read mput lists by large chunks, they can hold millions of lines
+_MPUT_READ_BUFSIZE = 1 << 20
+
+def _lexer_tokens(string, whitespace, whitespace_re):
+    """
+    Iterate over the tokens of a string split on whitespace characters,
+    honoring quotes and escapes the same way shlex does in posix mode. The
+    lexer is only run if the string contains characters it would interpret,
+    otherwise the compiled whitespace_re regexp gives the same tokens.
+    """
+    if not _LEXER_CHARS.search(string):
+        return filter(None, whitespace_re.split(string))
+
+    tkn_iter = shlex(string, posix=True)
+    tkn_iter.whitespace = whitespace
+    tkn_iter.whitespace_split = True
+
+    return tkn_iter
+
+def comma_list(value):
+    """Argument type converting 'a,b,c' into ['a', 'b', 'c']."""
+    return value.split(',')
+
+def comma_list_or_empty(value):
+    """Same as comma_list, but an empty string gives an empty list."""
+    return value.split(',') if value else []
 
 def attr_convert(usr_attr):
     """Convert k/v pairs as expressed by the user into a dictionnary."""
-    tkn_iter = shlex(usr_attr, posix=True)
-    tkn_iter.whitespace = '=,'
-    tkn_iter.whitespace_split = True
+    tkn_iter = iter(_lexer_tokens(usr_attr, '=,', _ATTR_SEPARATORS))
 
-    kv_pairs = list(tkn_iter) # [k0, v0, k1, v1...]
+    # Consume the tokens two by two: (k0, v0), (k1, v1)...
+    kv_pairs = list(zip_longest(tkn_iter, tkn_iter))
+    if kv_pairs and kv_pairs[-1][1] is None:
+        raise ValueError("Invalid attribute string: trailing %r" %
+                         (kv_pairs[-1][0],))
 
-    if len(kv_pairs) % 2 != 0:
-        print(kv_pairs)
-        raise ValueError("Invalid attribute string")
+    return dict(kv_pairs)
 
-    return dict(zip(kv_pairs[0::2], kv_pairs[1::2]))
+def _parse_attrs(usr_attr):
+    """
+    Convert an optional user attribute string, None, empty or '-' meaning no
+    attributes at all.
+    """
+    if not usr_attr or usr_attr == '-':
+        return None
+    return attr_convert(usr_attr)
 
 def mput_file_line_parser(line):
     """Convert a mput file line into the 3 values needed for each put."""
-    line_parser = shlex(line, posix=True)
-    line_parser.whitespace = ' '
-    line_parser.whitespace_split = True
-
-    file_entry = list(line_parser) # [src_file, oid, user_md]
+    # [src_file, oid, user_md]
+    file_entry = list(_lexer_tokens(line, ' ', _LINE_SEPARATORS))
 
     if len(file_entry) != 3:
         raise ValueError("Invalid number of values, only 3 expected "
@@ -165,11 +315,18 @@ class BaseOptHandler(object):
         """Add options for this specific command-line subsection."""
 
     @classmethod
-    def subparser_register(cls, base_parser):
-        """Register the subparser to a top-level one."""
+    def subparser_register(cls, base_parser, words=None):
+        """
+        Register the subparser to a top-level one. If the command line `words`
+        are given, options and verbs are only registered when they name this
+        handler, otherwise the subparser is a mere placeholder listed in the
+        parent usage.
+        """
         subparser = base_parser.add_parser(cls.label, help=cls.descr,
                                            epilog=cls.epilog,
                                            aliases=cls.alias)
+        if words is not None and words.isdisjoint([cls.label] + cls.alias):
+            return subparser
 
         # Register options relating to the current media
         cls.add_options(subparser)
@@ -179,7 +336,7 @@ class BaseOptHandler(object):
             v_parser = subparser.add_subparsers(dest='verb')
             v_parser.required = True
             for verb in cls.verbs:
-                verb.subparser_register(v_parser)
+                verb.subparser_register(v_parser, words)
 
         return subparser
 
@@ -220,6 +377,8 @@ class XferOptHandler(BaseOptHandler):
 
     def __enter__(self):
         """Initialize a client for data movements."""
+        # pylint: disable=import-outside-toplevel
+        from phobos.core.store import XferClient
         self.client = XferClient()
         return self
 
@@ -245,27 +404,22 @@ class StoreGetMDHandler(XferOptHandler):
         if err_code != 0:
             return
 
-        res = []
+        # pylint: disable=import-outside-toplevel
+        from phobos.core.store import attrs_as_dict
         itm = attrs_as_dict(xfr.contents.xd_attrs)
         if not itm:
             return
 
-        for k, v in sorted(itm.items()):
-            res.append('%s=%s' % (k, v))
-
-        print(','.join(res))
+        # Keys are unique, sort on them only rather than on (key, value) pairs
+        print(','.join(['%s=%s' % (k, itm[k]) for k in sorted(itm)]))
 
     def exec_getmd(self):
         """Retrieve an object attributes from backend."""
         oid = self.params.get('object_id')
         self.logger.debug("Retrieving attrs for 'objid:%s'", oid)
         self.client.getmd_register(oid, None)
-        try:
+        with env_error_guard(self.logger, "Cannot GETMD for 'objid:%s'", oid):
             self.client.run(compl_cb=self._compl_notify)
-        except IOError as err:
-            self.logger.error("Cannot GETMD for 'objid:%s': %s",
-                              oid, env_error_format(err))
-            sys.exit(os.EX_DATAERR)
 
 
 class StoreGetHandler(XferOptHandler):
@@ -289,36 +443,31 @@ class StoreGetHandler(XferOptHandler):
 
     def exec_get(self):
         """Retrieve an object from backend."""
-        oid = self.params.get('object_id')
-        dst = self.params.get('dest_file')
-        version = self.params.get('version')
-        uuid = self.params.get('uuid')
-        best_host = self.params.get('best_host')
+        param = self.params.get
+        oid = param('object_id')
+        dst = param('dest_file')
+        version = param('version')
+        uuid = param('uuid')
+        best_host = param('best_host')
         self.logger.debug("Retrieving object 'objid:%s' to '%s'", oid, dst)
         self.client.get_register(oid, dst, (uuid, version), best_host)
-        try:
+        with env_error_guard(self.logger, "Cannot GET 'objid:%s' to '%s'",
+                             oid, dst):
             self.client.run()
-        except IOError as err:
-            self.logger.error("Cannot GET 'objid:%s' to '%s': %s",
-                              oid, dst, env_error_format(err))
-            sys.exit(os.EX_DATAERR)
 
+        fmt = "Object '%s"
+        args = [oid]
         if version != 0:
-            if uuid is not None:
-                self.logger.info("Object '%s@%d' with uuid '%s' "
-                                 "successfully retrieved",
-                                 oid, version, uuid)
-            else:
-                self.logger.info("Object '%s@%d' successfully retrieved",
-                                 oid, version)
-        else:
-            if uuid is not None:
-                self.logger.info("Object '%s' with uuid '%s' "
-                                 "successfully retrieved",
-                                 oid, uuid)
-            else:
-                self.logger.info("Object '%s' successfully retrieved", oid)
+            fmt += "@%d"
+            args.append(version)
+        fmt += "'"
+        if uuid is not None:
+            fmt += " with uuid '%s'"
+            args.append(uuid)
+        self.logger.info(fmt + " successfully retrieved", *args)
+
 
+FAMILY_CHOICES = tuple(map(rsc_family2str, ResourceFamily))
 
 class StoreGenericPutHandler(XferOptHandler):
     """Base class for common options between put and mput"""
@@ -328,11 +477,11 @@ class StoreGenericPutHandler(XferOptHandler):
         super(StoreGenericPutHandler, cls).add_options(parser)
         # The type argument allows to transform 'a,b,c' into ['a', 'b', 'c'] at
         # parse time rather than post processing it
-        parser.add_argument('-T', '--tags', type=lambda t: t.split(','),
+        parser.add_argument('-T', '--tags', type=comma_list,
                             help='Only use media that contain all these tags '
                                  '(comma-separated: foo,bar)')
         parser.add_argument('-f', '--family',
-                            choices=list(map(rsc_family2str, ResourceFamily)),
+                            choices=FAMILY_CHOICES,
                             help='Targeted storage family')
         parser.add_argument('-l', '--layout', choices=["simple", "raid1"],
                             help='Desired storage layout')
@@ -341,6 +490,15 @@ class StoreGenericPutHandler(XferOptHandler):
                             'Specifically set family and layout supersede the '
                             'alias, tags are joined.')
 
+    def create_put_params(self):
+        """Build the put parameters from the command line ones."""
+        # pylint: disable=import-outside-toplevel
+        from phobos.core.store import PutParams
+        param = self.params.get
+        return PutParams(alias=param('alias'), family=param('family'),
+                         layout=param('layout'), overwrite=param('overwrite'),
+                         tags=param('tags', []))
+
 
 class StorePutHandler(StoreGenericPutHandler):
     """Insert objects into backend."""
@@ -360,29 +518,22 @@ class StorePutHandler(StoreGenericPutHandler):
 
     def exec_put(self):
         """Insert an object into backend."""
-        src = self.params.get('src_file')
-        oid = self.params.get('object_id')
+        param = self.params.get
+        src = param('src_file')
+        oid = param('object_id')
 
-        attrs = self.params.get('metadata')
+        attrs = _parse_attrs(param('metadata'))
         if attrs is not None:
-            attrs = attr_convert(attrs)
             self.logger.debug("Loaded attributes set %r", attrs)
 
-        put_params = PutParams(alias=self.params.get('alias'),
-                               family=self.params.get('family'),
-                               layout=self.params.get('layout'),
-                               overwrite=self.params.get('overwrite'),
-                               tags=self.params.get('tags', []))
+        put_params = self.create_put_params()
 
         self.logger.debug("Inserting object '%s' to 'objid:%s'", src, oid)
 
         self.client.put_register(oid, src, attrs=attrs, put_params=put_params)
-        try:
+        with env_error_guard(self.logger, "Cannot PUT '%s' to 'objid:%s'",
+                             src, oid):
             self.client.run()
-        except IOError as err:
-            self.logger.error("Cannot PUT '%s' to 'objid:%s': %s",
-                              src, oid, env_error_format(err))
-            sys.exit(os.EX_DATAERR)
 
 
 class StoreMPutHandler(StoreGenericPutHandler):
@@ -404,48 +555,42 @@ class StoreMPutHandler(StoreGenericPutHandler):
         if path == '-':
             fin = sys.stdin
         else:
-            fin = open(path)
+            fin = open(path, buffering=_MPUT_READ_BUFSIZE)
 
-        put_params = PutParams(self.params.get('family'),
-                               self.params.get('layout'),
-                               self.params.get('tags', []),
-                               self.params.get('alias'))
+        put_params = self.create_put_params()
+        # Transfers are only queued here and submitted together by run(), keep
+        # the per-line work as light as possible for large lists.
+        skip = _MPUT_SKIP.match
+        parse = mput_file_line_parser
+        register = self.client.put_register
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
 
         for i, line in enumerate(fin):
             # Skip empty lines and comments
-            line = line.strip()
-            if not line or line.startswith('#'):
+            if skip(line):
                 continue
 
+            line = line.strip()
             try:
-                match = mput_file_line_parser(line)
+                src, oid, attrs = parse(line)
             except ValueError:
                 self.logger.error("Format error on line %d: %s", i + 1, line)
                 sys.exit(os.EX_DATAERR)
 
-            src = match[0]
-            oid = match[1]
-            attrs = match[2]
-
-            if attrs == '-':
-                attrs = None
-            else:
-                attrs = attr_convert(attrs)
-                self.logger.debug("Loaded attributes set %r", attrs)
-
-            self.logger.debug("Inserting object '%s' to 'objid:%s'", src, oid)
-            self.client.put_register(oid, src, attrs=attrs,
-                                     put_params=put_params)
+            attrs = _parse_attrs(attrs)
+            if debug_enabled:
+                if attrs is not None:
+                    self.logger.debug("Loaded attributes set %r", attrs)
+                self.logger.debug("Inserting object '%s' to 'objid:%s'",
+                                  src, oid)
+            register(oid, src, attrs=attrs, put_params=put_params)
 
         if fin is not sys.stdin:
             fin.close()
 
-        try:
+        with env_error_guard(self.logger,
+                             "Cannot MPUT objects, see logs for details"):
             self.client.run()
-        except IOError as err:
-            self.logger.error("Cannot MPUT objects, see logs for details: %s",
-                              env_error_format(err))
-            sys.exit(os.EX_DATAERR)
 
 class AddOptHandler(DSSInteractHandler):
     """Insert a new resource into the system."""
@@ -469,7 +614,7 @@ class MediaAddOptHandler(AddOptHandler):
         super(MediaAddOptHandler, cls).add_options(parser)
         # The type argument allows to transform 'a,b,c' into ['a', 'b', 'c'] at
         # parse time rather than post processing it
-        parser.add_argument('-T', '--tags', type=lambda t: t.split(','),
+        parser.add_argument('-T', '--tags', type=comma_list,
                             help='tags to associate with this media (comma-'
                                  'separated: foo,bar)')
 
@@ -526,6 +671,9 @@ class UnlockOptHandler(DSSInteractHandler):
                             help='Do not check the current lock state')
 
 OP_NAME_FROM_LETTER = {'P': 'put', 'G': 'get', 'D': 'delete'}
+_ALL_OPS = tuple(OP_NAME_FROM_LETTER.values())
+_LETTER_SET = frozenset(OP_NAME_FROM_LETTER)
+
 def parse_set_access_flags(flags):
     """From [+|-]PGD flags, return a dict with media operations to set
 
@@ -533,31 +681,27 @@ def parse_set_access_flags(flags):
     Dict key are among {'put', 'get', 'delete'}.
     Dict values are among {True, False}.
     """
-    res = {}
     if not flags:
         return {}
 
-    if flags[0] == '+':
-        target = True
-        flags = flags[1:]
-    elif flags[0] == '-':
-        target = False
+    prefix = flags[0]
+    if prefix in '+-':
         flags = flags[1:]
-    else:
-        # present operations will be enabled
-        target = True
-        # absent operations will be disabled: preset all to False
-        for op_name in OP_NAME_FROM_LETTER.values():
-            res[op_name] = False
 
-    for op_letter in flags:
-        if op_letter not in OP_NAME_FROM_LETTER:
-            raise argparse.ArgumentTypeError(f'{op_letter} is not a valid '
-                                             'media operation flags')
+    if not _LETTER_SET.issuperset(flags):
+        op_letter = next(letter for letter in flags
+                         if letter not in _LETTER_SET)
+        raise argparse.ArgumentTypeError(f'{op_letter} is not a valid '
+                                         'media operation flags')
 
-        res[OP_NAME_FROM_LETTER[op_letter]] = target
+    present = {OP_NAME_FROM_LETTER[op_letter] for op_letter in flags}
+    if prefix == '+':
+        return dict.fromkeys(present, True)
+    if prefix == '-':
+        return dict.fromkeys(present, False)
 
-    return res
+    # present operations will be enabled, absent ones will be disabled
+    return {op_name: op_name in present for op_name in _ALL_OPS}
 
 class MediaSetAccessOptHandler(DSSInteractHandler):
     """Set media operation flags."""
@@ -578,23 +722,20 @@ class MediaSetAccessOptHandler(DSSInteractHandler):
         parser.add_argument('res', nargs='+', metavar='RESOURCE',
                             help='Resource(s) to update access mode')
 
-class DirSetAccessOptHandler(MediaSetAccessOptHandler):
-    """Set media operation flags to directory media."""
-    epilog = """Examples:
-phobos dir set-access GD      # allow get and delete, forbid put
-phobos dir set-access +PG     # allow put, get (other flags are unchanged)
-phobos dir set-access -- -P   # forbid put (other flags are unchanged)
+SET_ACCESS_EPILOG = """Examples:
+phobos {family} set-access GD      # allow get and delete, forbid put
+phobos {family} set-access +PG     # allow put, get (other flags are unchanged)
+phobos {family} set-access -- -P   # forbid put (other flags are unchanged)
 (Warning: use the '--' separator to use the -PGD flags syntax)
 """
 
+class DirSetAccessOptHandler(MediaSetAccessOptHandler):
+    """Set media operation flags to directory media."""
+    epilog = SET_ACCESS_EPILOG.format(family='dir')
+
 class TapeSetAccessOptHandler(MediaSetAccessOptHandler):
     """Set media operation flags to tape media."""
-    epilog = """Examples:
-phobos tape set-access GD      # allow get and delete, forbid put
-phobos tape set-access +PG     # allow put, get (other flags are unchanged)
-phobos tape set-access -- -P   # forbid put (other flags are unchanged)
-(Warning: use the '--' separator to use the -PGD flags syntax)
-"""
+    epilog = SET_ACCESS_EPILOG.format(family='tape')
 
 class ScanOptHandler(BaseOptHandler):
     """Scan a physical resource and display retrieved information."""
@@ -626,9 +767,8 @@ class DriveListOptHandler(ListOptHandler):
         super(DriveListOptHandler, cls).add_options(parser)
         parser.add_argument('-m', '--model', help='filter on model')
 
-        attr = list(DevInfo().get_display_dict().keys())
-        attr.sort()
-        parser.add_argument('-o', '--output', type=lambda t: t.split(','),
+        attr = display_keys(DevInfo)
+        parser.add_argument('-o', '--output', type=comma_list,
                             default='name',
                             help=("attributes to output, comma-separated, "
                                   "choose from {" + " ".join(attr) + "} "
@@ -644,12 +784,11 @@ class MediaListOptHandler(ListOptHandler):
     def add_options(cls, parser):
         """Add resource-specific options."""
         super(MediaListOptHandler, cls).add_options(parser)
-        parser.add_argument('-T', '--tags', type=lambda t: t.split(','),
+        parser.add_argument('-T', '--tags', type=comma_list,
                             help='filter on tags (comma-separated: foo,bar)')
 
-        attr = list(MediaInfo().get_display_dict().keys())
-        attr.sort()
-        parser.add_argument('-o', '--output', type=lambda t: t.split(','),
+        attr = display_keys(MediaInfo)
+        parser.add_argument('-o', '--output', type=comma_list,
                             default='name',
                             help=("attributes to output, comma-separated, "
                                   "choose from {" + " ".join(attr) + "} "
@@ -666,17 +805,15 @@ class ObjectListOptHandler(ListOptHandler):
         """Add object-specific options."""
         super(ObjectListOptHandler, cls).add_options(parser)
 
-        base_attrs = list(ObjectInfo().get_display_dict().keys())
-        base_attrs.sort()
-        ext_attrs = list(DeprecatedObjectInfo().get_display_dict().keys() -
-                         ObjectInfo().get_display_dict().keys())
-        ext_attrs.sort()
-        parser.add_argument('-o', '--output', type=lambda t: t.split(','),
+        base_attrs = display_keys(ObjectInfo)
+        ext_attrs = sorted(set(display_keys(DeprecatedObjectInfo)) -
+                           set(base_attrs))
+        parser.add_argument('-o', '--output', type=comma_list,
                             default='oid',
                             help=("attributes to output, comma-separated, "
                                   "choose from {" + " ".join(base_attrs) + "} "
                                   "default: %(default)s"))
-        parser.add_argument('-m', '--metadata', type=lambda t: t.split(','),
+        parser.add_argument('-m', '--metadata', type=comma_list,
                             help="filter items containing every given "
                                  "metadata, comma-separated "
                                  "'key=value' parameters")
@@ -711,16 +848,11 @@ class DeleteOptHandler(BaseOptHandler):
                             help='Object IDs to delete')
         parser.set_defaults(verb=cls.label)
 
+    @exit_on_env_error("Cannot delete objects")
     def exec_delete(self):
         """Delete objects."""
-
-        client = UtilClient()
-        try:
-            client.object_delete(self.params.get('oids'))
-        except EnvironmentError as err:
-            self.logger.error("Cannot delete objects: %s",
-                              env_error_format(err))
-            sys.exit(os.EX_DATAERR)
+        client = util_client()
+        client.object_delete(self.params.get('oids'))
 
 class UuidOptHandler(BaseOptHandler):
     """Handler to select objects with a list of uuids"""
@@ -779,25 +911,17 @@ class UndeleteOptHandler(BaseOptHandler):
     def __exit__(self, exc_type, exc_value, traceback):
         pass
 
+    @exit_on_env_error("Cannot undelete objects by uuids")
     def exec_uuid(self):
         """Undelete by uuids"""
-        client = UtilClient()
-        try:
-            client.undelete((), self.params.get('uuids'))
-        except EnvironmentError as err:
-            self.logger.error("Cannot undelete objects by uuids: %s",
-                              env_error_format(err))
-            sys.exit(os.EX_DATAERR)
+        client = util_client()
+        client.undelete((), self.params.get('uuids'))
 
+    @exit_on_env_error("Cannot undelete objects by oids")
     def exec_oid(self):
         """Undelete by oids"""
-        client = UtilClient()
-        try:
-            client.undelete(self.params.get('oids'), ())
-        except EnvironmentError as err:
-            self.logger.error("Cannot undelete objectsby oids: %s",
-                              env_error_format(err))
-            sys.exit(os.EX_DATAERR)
+        client = util_client()
+        client.undelete(self.params.get('oids'), ())
 
 class LocateOptHandler(BaseOptHandler):
     """Locate object handler."""
@@ -818,14 +942,11 @@ class LocateOptHandler(BaseOptHandler):
         parser.add_argument('oid', help='Object ID to locate')
         parser.set_defaults(verb=cls.label)
 
+    @exit_on_env_error("Cannot locate object")
     def exec_locate(self):
         """Locate object"""
-        client = UtilClient()
-        try:
-            print(client.object_locate(self.params.get('oid')))
-        except EnvironmentError as err:
-            self.logger.error("Cannot locate object: %s", env_error_format(err))
-            sys.exit(os.EX_DATAERR)
+        client = util_client()
+        print(client.object_locate(self.params.get('oid')))
 
 class ExtentListOptHandler(ListOptHandler):
     """
@@ -838,9 +959,8 @@ class ExtentListOptHandler(ListOptHandler):
         """Add extent-specific options."""
         super(ExtentListOptHandler, cls).add_options(parser)
 
-        attr = list(LayoutInfo().get_display_dict().keys())
-        attr.sort()
-        parser.add_argument('-o', '--output', type=lambda t: t.split(','),
+        attr = display_keys(LayoutInfo)
+        parser.add_argument('-o', '--output', type=comma_list,
                             default='oid',
                             help=("attributes to output, comma-separated, "
                                   "choose from {" + " ".join(attr) + "} "
@@ -859,9 +979,9 @@ class TapeAddOptHandler(MediaAddOptHandler):
     def add_options(cls, parser):
         """Add resource-specific options."""
         super(TapeAddOptHandler, cls).add_options(parser)
-        parser.add_argument('-t', '--type', required=True,
+        parser.add_argument('-t', '--type', required=True, type=str.upper,
                             help='tape technology')
-        parser.add_argument('--fs', default="LTFS",
+        parser.add_argument('--fs', default="LTFS", type=str.upper,
                             help='Filesystem type (default: LTFS)')
 
 class MediumLocateOptHandler(DSSInteractHandler):
@@ -883,7 +1003,8 @@ class MediaUpdateOptHandler(DSSInteractHandler):
     def add_options(cls, parser):
         """Add resource-specific options."""
         super(MediaUpdateOptHandler, cls).add_options(parser)
-        parser.add_argument('-T', '--tags', type=lambda t: t.split(','),
+        # Empty string clears tags, whereas ''.split(',') == ['']
+        parser.add_argument('-T', '--tags', type=comma_list_or_empty,
                             help='New tags for this media (comma-separated, '
                                  'e.g. "-T foo,bar"), empty string to clear '
                                  'tags')
@@ -931,41 +1052,32 @@ class ObjectOptHandler(BaseResourceOptHandler):
 
     def exec_list(self):
         """List objects."""
-        attrs = list(DeprecatedObjectInfo().get_display_dict().keys()
-                     if self.params.get('deprecated')
-                     else ObjectInfo().get_display_dict().keys())
-        attrs.extend(['*', 'all'])
-        out_attrs = self.params.get('output')
-        bad_attrs = set(out_attrs).difference(set(attrs))
-        if bad_attrs:
-            self.logger.error("Bad output attributes: %s", " ".join(bad_attrs))
-            sys.exit(os.EX_USAGE)
-
-        metadata = []
-        if self.params.get('metadata'):
-            metadata = self.params.get('metadata')
-            for elt in metadata:
-                if '=' not in elt:
-                    self.logger.error("Metadata parameter '%s' must be a "
-                                      "'key=value'", elt)
-                    sys.exit(os.EX_USAGE)
-
-        client = UtilClient()
+        param = self.params.get
+        deprecated = param('deprecated')
+        attrs = display_keys(DeprecatedObjectInfo if deprecated
+                             else ObjectInfo)
+        out_attrs = param('output')
+        check_output_attributes(attrs, out_attrs, self.logger)
+
+        metadata = param('metadata') or []
+        for elt in metadata:
+            if '=' not in elt:
+                self.logger.error("Metadata parameter '%s' must be a "
+                                  "'key=value'", elt)
+                sys.exit(os.EX_USAGE)
+
+        client = util_client()
+
+        with env_error_guard(self.logger, "Cannot list objects"):
+            objs = client.object_list(param('res'), param('pattern'),
+                                      metadata, deprecated)
 
-        try:
-            objs = client.object_list(self.params.get('res'),
-                                      self.params.get('pattern'),
-                                      metadata,
-                                      self.params.get('deprecated'))
-
-            if objs:
-                dump_object_list(objs, attr=out_attrs,
-                                 fmt=self.params.get('format'))
-
-            client.list_free(objs, len(objs))
-        except EnvironmentError as err:
-            self.logger.error("Cannot list objects: %s", env_error_format(err))
-            sys.exit(os.EX_DATAERR)
+            try:
+                if objs:
+                    dump_object_list(objs, attr=out_attrs,
+                                     fmt=param('format'))
+            finally:
+                client.list_free(objs, len(objs))
 
 class DeviceOptHandler(BaseResourceOptHandler):
     """Shared interface for devices."""
@@ -976,59 +1088,48 @@ class DeviceOptHandler(BaseResourceOptHandler):
         UnlockOptHandler
     ]
 
-    def filter(self, ident, **kwargs):
+    def filter(self, idents, **kwargs):
         """
-        Return a list of devices that match the identifier for either serial or
-        path. You may call it a bug but this is a feature intended to let admins
-        transparently address devices using one or the other scheme.
+        Return, for each identifier and in their order, the list of devices
+        that match it for either serial or path. You may call it a bug but this
+        is a feature intended to let admins transparently address devices using
+        one or the other scheme.
         """
-        dev = self.client.devices.get(family=self.family, serial=ident,
-                                      **kwargs)
-        if not dev:
-            # 2nd attempt, by path...
-            dev = self.client.devices.get(family=self.family, path=ident,
-                                          **kwargs)
-        return dev
-
+        devs = self.client.devices.get(family=self.family,
+                                       serial__or__path=list(idents), **kwargs)
+        by_serial = {}
+        by_path = {}
+        for dev in devs:
+            by_serial.setdefault(dev.name, []).append(dev)
+            # Several devices may share a path, eg. on different hosts
+            by_path.setdefault(dev.path, []).append(dev)
+        # serial matches take precedence over path ones
+        return [by_serial.get(ident) or by_path.get(ident, [])
+                for ident in idents]
+
+    @exit_on_env_error("Cannot add device")
     def exec_add(self):
         """Add a new device"""
         resources = self.params.get('res')
-
-        try:
-            with AdminClient(lrs_required=False) as adm:
-                adm.device_add(self.family, resources,
-                               not self.params.get('unlock'))
-        except EnvironmentError as err:
-            self.logger.error("Cannot add device: %s", env_error_format(err))
-            sys.exit(os.EX_DATAERR)
+        _get_admin().device_add(self.family, resources,
+                                not self.params.get('unlock'))
 
         self.logger.info("Added %d device(s) successfully", len(resources))
 
+    @exit_on_env_error("Failed to lock device(s)")
     def exec_lock(self):
         """Device lock"""
         names = self.params.get('res')
-
-        try:
-            with AdminClient(lrs_required=False) as adm:
-                adm.device_lock(self.family, names, self.params.get('force'))
-        except EnvironmentError as err:
-            self.logger.error("Failed to lock device(s): %s",
-                              env_error_format(err))
-            sys.exit(os.EX_DATAERR)
+        _get_admin().device_lock(self.family, names, self.params.get('force'))
 
         self.logger.info("%d device(s) locked", len(names))
 
+    @exit_on_env_error("Failed to unlock device(s)")
     def exec_unlock(self):
         """Device unlock"""
         names = self.params.get('res')
-
-        try:
-            with AdminClient(lrs_required=False) as adm:
-                adm.device_unlock(self.family, names, self.params.get('force'))
-        except EnvironmentError as err:
-            self.logger.error("Failed to unlock device(s): %s",
-                              env_error_format(err))
-            sys.exit(os.EX_DATAERR)
+        _get_admin().device_unlock(self.family, names,
+                                   self.params.get('force'))
 
         self.logger.info("%d device(s) unlocked", len(names))
 
@@ -1047,73 +1148,41 @@ class MediaOptHandler(BaseResourceOptHandler):
 
     def exec_add(self):
         """Add new media."""
-        names = NodeSet.fromlist(self.params.get('res'))
-        fstype = self.params.get('fs').upper()
-        techno = self.params.get('type', '').upper()
+        names = nodeset_fromlist(self.params.get('res'))
+        fstype = self.params.get('fs')
+        techno = self.params.get('type')
         tags = self.params.get('tags', [])
         keep_locked = not self.params.get('unlock')
 
-        for med in names:
-            try:
-                medium = MediaInfo(family=self.family, name=med, model=techno,
-                                   is_adm_locked=keep_locked)
-                self.client.media.add(medium, fstype, tags=tags)
-            except EnvironmentError as err:
-                self.logger.error("Cannot add medium %s: %s", med,
-                                  env_error_format(err))
-                sys.exit(os.EX_DATAERR)
+        media = [MediaInfo(family=self.family, name=med, model=techno,
+                           is_adm_locked=keep_locked) for med in names]
+        with env_error_guard(self.logger, "Cannot add media %s",
+                             ",".join(self.params.get('res'))):
+            self.client.media.add_many(media, fstype, tags=tags)
 
         self.logger.info("Added %d media successfully", len(names))
 
     def exec_update(self):
         """Update an existing media"""
-        uids = NodeSet.fromlist(self.params.get('res'))
+        uids = nodeset_fromlist(self.params.get('res'))
         tags = self.params.get('tags')
         if tags is None:
             self.logger.info("No update to be performed")
             return
 
-        # Empty string clears tag and ''.split(',') == ['']
-        if tags == ['']:
-            tags = []
-
-        failed = []
-        for uid in uids:
-            # Retrieve full media and check that it exists
-            media = self.client.media.get(family=self.family, id=uid)
-            if not media:
-                self.logger.error("No '%s' media found", uid)
-                failed.append(uid)
-                continue
-
-            # Unlikely: means an incoherent db
-            if len(media) > 1:
-                raise RuntimeError("multiple media have the same id: %s" % uid)
-            media = media[0]
-
-            # Attempt to lock the media to avoid concurrent modifications
-            try:
-                self.client.media.lock([media])
-            except EnvironmentError as err:
-                self.logger.error("Failed to lock media '%s': %s",
-                                  uid, env_error_format(err))
-                failed.append(uid)
-                continue
-
-            media = self.client.media.get(family=self.family, id=uid)
-            assert len(media) == 1
-            media = media[0]
-
+        media, missing, busy = self._lock_media(uids)
+        failed = missing + busy
+        for medium in media:
             # Update tags
             try:
-                media.tags = tags
-                self.client.media.update([media])
+                medium.tags = tags
+                self.client.media.update([medium])
             except EnvironmentError as err:
                 self.logger.error("Failed to update media '%s': %s",
-                                  uid, env_error_format(err))
-                failed.append(uid)
+                                  medium.name, env_error_format(err))
+                failed.append(medium.name)
             finally:
-                self.client.media.unlock([media])
+                self.client.media.unlock([medium])
 
         if failed:
             self.logger.error("Failed to update: %s", ", ".join(failed))
@@ -1121,10 +1190,14 @@ class MediaOptHandler(BaseResourceOptHandler):
 
     def exec_format(self):
         """Format media however requested."""
-        media_list = NodeSet.fromlist(self.params.get('res'))
+        media_list = nodeset_fromlist(self.params.get('res'))
         fs_type = self.params.get('fs')
         unlock = self.params.get('unlock')
 
+        # The client holds a connection to the LRS daemon, only keep it for the
+        # duration of the action.
+        # pylint: disable=import-outside-toplevel
+        from phobos.core.admin import Client as AdminClient
         try:
             with AdminClient(lrs_required=True) as adm:
                 if unlock:
@@ -1138,145 +1211,121 @@ class MediaOptHandler(BaseResourceOptHandler):
 
     def exec_list(self):
         """List media and display results."""
-        attrs = list(MediaInfo().get_display_dict().keys())
-        attrs.extend(['*', 'all'])
+        attrs = display_keys(MediaInfo)
         out_attrs = self.params.get('output')
-        bad_attrs = set(out_attrs).difference(set(attrs))
-        if bad_attrs:
-            self.logger.error("Bad output attributes: %s", " ".join(bad_attrs))
-            sys.exit(os.EX_USAGE)
+        check_output_attributes(attrs, out_attrs, self.logger)
 
         kwargs = {}
-        if self.params.get('tags'):
-            kwargs["tags"] = self.params.get('tags')
-
-        objs = []
-        if self.params.get('res'):
-            uids = NodeSet.fromlist(self.params.get('res'))
-            for uid in uids:
-                curr = self.client.media.get(family=self.family, id=uid,
-                                             **kwargs)
-                if not curr:
-                    continue
-                assert len(curr) == 1
-                objs.append(curr[0])
+        tags = self.params.get('tags')
+        if tags:
+            kwargs["tags"] = tags
+
+        res = self.params.get('res')
+        if res:
+            uids = nodeset_fromlist(res)
+            media = {medium.name: medium for medium in
+                     self.client.media.get(family=self.family,
+                                           id__in=list(uids), **kwargs)}
+            objs = [media[uid] for uid in uids if uid in media]
         else:
             objs = list(self.client.media.get(family=self.family, **kwargs))
 
-        if len(objs) > 0:
-            dump_object_list(objs, attr=self.params.get('output'),
+        if objs:
+            dump_object_list(objs, attr=out_attrs,
                              fmt=self.params.get('format'))
 
-    def exec_lock(self):
-        """Lock media"""
-        results = []
-        uids = NodeSet.fromlist(self.params.get('res'))
+    def _lock_media(self, uids):
+        """
+        Lock the media with the given ids to avoid concurrent modifications.
+
+        Return the up-to-date version of the locked media, along with the ids
+        of the media that do not exist and of those that could not be locked.
+        Both are reported and skipped.
+        """
+        media = self.client.media.get(family=self.family, id__in=list(uids))
+        found = set(medium.name for medium in media)
+        missing = []
         for uid in uids:
-            media = self.client.media.get(id=uid)
-            assert len(media) == 1
+            if uid not in found:
+                self.logger.error("No '%s' media found", uid)
+                missing.append(uid)
 
-            # Attempt to lock the media to avoid concurrent modifications
+        locked = []
+        busy = []
+        for medium in media:
             try:
-                self.client.media.lock([media[0]])
+                self.client.media.lock([medium])
             except EnvironmentError as err:
                 self.logger.error("Failed to lock media '%s': %s",
-                                  uid, env_error_format(err))
+                                  medium.name, env_error_format(err))
+                busy.append(medium.name)
                 continue
+            locked.append(medium.name)
 
-            media = self.client.media.get(id=uid)
-            assert len(media) == 1
-
-            media[0].rsc.adm_status = PHO_RSC_ADM_ST_LOCKED
-            results.append(media[0])
+        if locked:
+            media = list(self.client.media.get(family=self.family,
+                                               id__in=locked))
+        else:
+            media = []
+        return media, missing, busy
 
-        if len(results) != len(uids):
+    def _abort_locked(self, media, busy):
+        """
+        Release the media locked by _lock_media and exit, after a missing or
+        busy medium prevented the whole action.
+        """
+        if media:
+            self.client.media.unlock(media)
+        if busy:
             self.logger.error("At least one media is in use, use --force")
-            # TODO: unlock media
-            sys.exit(os.EX_DATAERR)
+        sys.exit(os.EX_DATAERR)
+
+    def _set_adm_status(self, adm_status, action):
+        """Set the administrative status of the media given on command line"""
+        uids = nodeset_fromlist(self.params.get('res'))
+        results, missing, busy = self._lock_media(uids)
+        if missing or busy:
+            self._abort_locked(results, busy)
+
+        for medium in results:
+            if adm_status == PHO_RSC_ADM_ST_UNLOCKED and \
+               medium.rsc.adm_status == adm_status:
+                self.logger.warning("Media %s is already unlocked",
+                                    medium.name)
+            medium.rsc.adm_status = adm_status
 
         try:
             self.client.media.update(results)
         except EnvironmentError as err:
-            self.logger.error("Failed to lock one or more media(s): %s",
+            self.logger.error("Failed to %s one or more media(s): %s", action,
                               env_error_format(err))
             sys.exit(os.EX_DATAERR)
         finally:
             self.client.media.unlock(results)
 
-        self.logger.info("%d media(s) locked", len(results))
+        self.logger.info("%d media(s) %sed", len(results), action)
+
+    def exec_lock(self):
+        """Lock media"""
+        self._set_adm_status(PHO_RSC_ADM_ST_LOCKED, 'lock')
 
     def exec_unlock(self):
         """Unlock media"""
-        results = []
-        uids = NodeSet.fromlist(self.params.get('res'))
-        for uid in uids:
-            media = self.client.media.get(id=uid)
-            assert len(media) == 1
-
-            # Attempt to lock the media to avoid concurrent modifications
-            try:
-                self.client.media.lock([media[0]])
-            except EnvironmentError as err:
-                self.logger.error("Failed to lock media '%s': %s",
-                                  uid, env_error_format(err))
-                continue
-
-            media = self.client.media.get(id=uid)
-            assert len(media) == 1
-
-            if media[0].rsc.adm_status == PHO_RSC_ADM_ST_UNLOCKED:
-                self.logger.warning("Media %s is already unlocked", uid)
-
-            media[0].rsc.adm_status = PHO_RSC_ADM_ST_UNLOCKED
-            results.append(media[0])
-
-        if len(results) != len(uids):
-            self.logger.error("At least one media is in use, use --force")
-            # TODO: unlock media
-            sys.exit(os.EX_DATAERR)
-
-        try:
-            self.client.media.update(results)
-        except EnvironmentError as err:
-            self.logger.error("Failed to unlock one or more media(s): %s",
-                              env_error_format(err))
-            sys.exit(os.EX_DATAERR)
-        finally:
-            self.client.media.unlock(results)
-
-        self.logger.info("%d media(s) unlocked", len(results))
+        self._set_adm_status(PHO_RSC_ADM_ST_UNLOCKED, 'unlock')
 
     def exec_set_access(self):
         """Update media operations flags"""
-        results = []
-        uids = NodeSet.fromlist(self.params.get('res'))
-        for uid in uids:
-            media = self.client.media.get(id=uid)
-            assert len(media) == 1
-
-            # Attempt to lock the media to avoid concurrent modifications
-            try:
-                self.client.media.lock([media[0]])
-            except EnvironmentError as err:
-                self.logger.error("Failed to lock medium '%s': %s",
-                                  uid, env_error_format(err))
-                self.client.media.unlock(results)
-                sys.exit(os.EX_DATAERR)
-
-            media = self.client.media.get(id=uid)
-            assert len(media) == 1
-
-            flags = self.params.get('flags')
-            if 'put' in flags:
-                media[0].put_access = flags['put']
-
-            if 'get' in flags:
-                media[0].get_access = flags['get']
-
-            if 'delete' in flags:
-                media[0].delete_access = flags['delete']
-
-            results.append(media[0])
+        uids = nodeset_fromlist(self.params.get('res'))
+        results, missing, busy = self._lock_media(uids)
+        if missing or busy:
+            self._abort_locked(results, busy)
+
+        # flags only hold the operations to update, eg. {'put': True}
+        access = [(op + '_access', allowed)
+                  for op, allowed in self.params.get('flags').items()]
+        for medium in results:
+            for attr, allowed in access:
+                setattr(medium, attr, allowed)
 
         try:
             self.client.media.update(results)
@@ -1289,14 +1338,10 @@ class MediaOptHandler(BaseResourceOptHandler):
 
         self.logger.info("%d media(s) updated", len(results))
 
+    @exit_on_env_error("Cannot locate medium")
     def exec_locate(self):
         """Locate a medium"""
-        try:
-            with AdminClient(lrs_required=False) as adm:
-                print(adm.medium_locate(self.family, self.params.get('res')))
-        except EnvironmentError as err:
-            self.logger.error("Cannot locate medium: %s", env_error_format(err))
-            sys.exit(os.EX_DATAERR)
+        print(_get_admin().medium_locate(self.family, self.params.get('res')))
 
 class PingOptHandler(BaseOptHandler):
     """Ping phobos daemon"""
@@ -1317,6 +1362,8 @@ class PingOptHandler(BaseOptHandler):
 
     def exec_ping(self):
         """Ping the daemon to check if it is online."""
+        # pylint: disable=import-outside-toplevel
+        from phobos.core.admin import Client as AdminClient
         try:
             with AdminClient(lrs_required=True) as adm:
                 adm.ping()
@@ -1355,26 +1402,26 @@ class DirOptHandler(MediaOptHandler):
         valid_count = 0
 
         try:
-            with AdminClient(lrs_required=False) as adm:
-                for path in resources:
-                # Remove any trailing slash
-                    path = path.rstrip('/')
-                    medium_is_added = False
-
-                    try:
-                        medium = MediaInfo(family=self.family, name=path,
-                                           model=None,
-                                           is_adm_locked=keep_locked)
-                        self.client.media.add(medium, 'POSIX', tags=tags)
-                        medium_is_added = True
-                        adm.device_add(self.family, [path], False)
-                        valid_count += 1
-                    except EnvironmentError as err:
-                        self.logger.error("Cannot add directory: %s",
-                                          env_error_format(err))
-                        if medium_is_added:
-                            self.client.media.remove(self.family, path)
-                        continue
+            adm = _get_admin()
+            for path in resources:
+            # Remove any trailing slash
+                path = path.rstrip('/')
+                medium_is_added = False
+
+                try:
+                    medium = MediaInfo(family=self.family, name=path,
+                                       model=None,
+                                       is_adm_locked=keep_locked)
+                    self.client.media.add(medium, 'POSIX', tags=tags)
+                    medium_is_added = True
+                    adm.device_add(self.family, [path], False)
+                    valid_count += 1
+                except EnvironmentError as err:
+                    self.logger.error("Cannot add directory: %s",
+                                      env_error_format(err))
+                    if medium_is_added:
+                        self.client.media.remove(self.family, path)
+                    continue
 
         except EnvironmentError as err:
             self.logger.error("Cannot add directories: %s",
@@ -1399,31 +1446,34 @@ class DriveOptHandler(DeviceOptHandler):
 
     def exec_list(self):
         """List devices and display results."""
-        attrs = list(DevInfo().get_display_dict().keys())
-        attrs.extend(['*', 'all'])
+        attrs = display_keys(DevInfo)
         out_attrs = self.params.get('output')
-        bad_attrs = set(out_attrs).difference(set(attrs))
-        if bad_attrs:
-            self.logger.error("Bad output attributes: %s", " ".join(bad_attrs))
-            sys.exit(os.EX_USAGE)
+        check_output_attributes(attrs, out_attrs, self.logger)
 
         kwargs = {}
-        if self.params.get('model'):
-            kwargs['model'] = self.params.get('model')
-
-        objs = []
-        if self.params.get('res'):
-            for serial in self.params.get('res'):
-                curr = self.filter(serial, **kwargs)
-                if not curr:
-                    continue
-                assert len(curr) == 1
-                objs.append(curr[0])
+        model = self.params.get('model')
+        if model:
+            kwargs['model'] = model
+
+        res = self.params.get('res')
+        if res:
+            matches = self.filter(res, **kwargs)
+            ambiguous = False
+            for ident, devs in zip(res, matches):
+                if len(devs) > 1:
+                    self.logger.error("'%s' matches %d drives (%s), use a "
+                                      "serial instead", ident, len(devs),
+                                      ", ".join(dev.name for dev in devs))
+                    ambiguous = True
+            if ambiguous:
+                sys.exit(os.EX_USAGE)
+
+            objs = [devs[0] for devs in matches if devs]
         else:
-            objs = list(self.client.devices.get(family=self.family, **kwargs))
+            objs = self.client.devices.get(family=self.family, **kwargs)
 
-        if len(objs) > 0:
-            dump_object_list(objs, attr=self.params.get('output'),
+        if objs:
+            dump_object_list(objs, attr=out_attrs,
                              fmt=self.params.get('format'))
 
 class TapeOptHandler(MediaOptHandler):
@@ -1452,26 +1502,23 @@ class ExtentOptHandler(BaseResourceOptHandler):
 
     def exec_list(self):
         """List extents."""
-        attrs = list(LayoutInfo().get_display_dict().keys())
-        attrs.extend(['*', 'all'])
+        attrs = display_keys(LayoutInfo)
         out_attrs = self.params.get('output')
-        bad_attrs = set(out_attrs).difference(set(attrs))
-        if bad_attrs:
-            self.logger.error("Bad output attributes: %s", " ".join(bad_attrs))
-            sys.exit(os.EX_USAGE)
+        check_output_attributes(attrs, out_attrs, self.logger)
 
         try:
-            with AdminClient(lrs_required=False) as adm:
-                obj_list, p_objs, n_objs = adm.layout_list(
-                    self.params.get('res'),
-                    self.params.get('pattern'),
-                    self.params.get('name'),
-                    self.params.get('degroup'))
-
-                if len(obj_list) > 0:
+            adm = _get_admin()
+            obj_list, p_objs, n_objs = adm.layout_list(
+                self.params.get('res'),
+                self.params.get('pattern'),
+                self.params.get('name'),
+                self.params.get('degroup'))
+
+            try:
+                if obj_list:
                     dump_object_list(obj_list, attr=out_attrs,
                                      fmt=self.params.get('format'))
-
+            finally:
                 adm.layout_list_free(p_objs, n_objs)
         except EnvironmentError:
             self.logger.error("Cannot list extents")
@@ -1490,6 +1537,8 @@ class LibOptHandler(BaseResourceOptHandler):
 
     def exec_scan(self):
         """Scan this lib and display the result"""
+        # pylint: disable=import-outside-toplevel
+        from phobos.core.ldm import LibAdapter
         for lib_dev in self.params.get("res"):
             lib_data = LibAdapter(PHO_LIB_SCSI, lib_dev).scan()
             # FIXME: can't use dump_object_list yet as it does not play well
@@ -1499,20 +1548,26 @@ class LibOptHandler(BaseResourceOptHandler):
     @staticmethod
     def _print_lib_data(lib_data):
         """Print library data in a human readable format"""
+        # Elements of a given type share the same keys: only sort them once
+        # per distinct key set
+        sorted_keys = {}
+        lines = []
         for elt in lib_data:
-            done = set(["type"])
+            keys = tuple(elt)
+            if keys not in sorted_keys:
+                sorted_keys[keys] = [key for key in sorted(keys) if key not in
+                                     ("type", "address", "source_address")]
+
             line = []
             flags = []
             line.append("%s:" % (elt.get("type", "element"),))
-            for key in "address", "source_address":
+            for key, fmt in (("address", "address=%#x"),
+                             ("source_address", "source_address=%#x")):
                 if key in elt:
-                    line.append("%s=%#x" % (key, elt[key]))
-                    done.add(key)
+                    line.append(fmt % elt[key])
 
-            for key in sorted(elt):
+            for key in sorted_keys[keys]:
                 value = elt[key]
-                if key in done:
-                    continue
                 if isinstance(value, bool):
                     if value:
                         # Flags are printed after the other properties
@@ -1520,7 +1575,10 @@ class LibOptHandler(BaseResourceOptHandler):
                 else:
                     line.append("%s=%r" % (key, str(value)))
             line.extend(flags)
-            print(" ".join(line))
+            lines.append(" ".join(line))
+
+        if lines:
+            print("\n".join(lines))
 
 SYSLOG_LOG_LEVELS = ["critical", "error", "warning", "info", "debug"]
 
@@ -1559,7 +1617,7 @@ class PhobosActionContext(object):
         self.parser = None
         self.parameters = None
 
-        self.install_arg_parser()
+        self.install_arg_parser(args)
 
         self.args = self.parser.parse_args(args)
         self.parameters = vars(self.args)
@@ -1573,10 +1631,18 @@ class PhobosActionContext(object):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
+        _release_admin()
         self.log_ctx.set_callback(None)
 
-    def install_arg_parser(self):
-        """Initialize hierarchical command line parser."""
+    def install_arg_parser(self, args=None):
+        """
+        Initialize hierarchical command line parser.
+
+        Building the options and verbs of every handler is by far the most
+        expensive part of the CLI startup, so only the handlers and verbs named
+        in `args` get them.
+        """
+        words = frozenset(sys.argv[1:] if args is None else args)
         # Top-level parser for common options
         self.parser = argparse.ArgumentParser('phobos',
                                               description= \
@@ -1599,7 +1665,7 @@ class PhobosActionContext(object):
 
         # Register misc actions handlers
         for handler in self.supported_handlers:
-            handler.subparser_register(sub)
+            handler.subparser_register(sub, words)
 
     def load_config(self):
         """Load configuration file."""
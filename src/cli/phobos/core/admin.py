@@ -25,8 +25,8 @@ Provide access to admin commands with the right level (tm) of abstraction.
 
 import errno
 
-from ctypes import (addressof, byref, c_int, c_char_p, cast, pointer, POINTER,
-                    Structure)
+from ctypes import (addressof, byref, c_int, c_char_p, c_void_p, cast, pointer,
+                    POINTER, Structure)
 
 from phobos.core.const import (PHO_FS_LTFS, PHO_FS_POSIX, # pylint: disable=no-name-in-module
                                PHO_RSC_DIR, PHO_RSC_TAPE)
@@ -34,6 +34,23 @@ from phobos.core.dss import DSSHandle
 from phobos.core.ffi import (CommInfo, ExtentInfo, LayoutInfo, LIBPHOBOS_ADMIN,
                              Id)
 
+# Resource family and filesystem type enum, by lowercase filesystem name
+FS_TYPES = {
+    'ltfs': (PHO_RSC_TAPE, PHO_FS_LTFS),
+    'posix': (PHO_RSC_DIR, PHO_FS_POSIX),
+}
+
+def _id_array(family, names):
+    """
+    Build a C array of resource identifiers, filled in place rather than
+    copied from a list of temporary Id instances.
+    """
+    ids = (Id * len(names))()
+    for rsc_id, name in zip(ids, names):
+        rsc_id.family = family
+        rsc_id.name = name
+    return ids
+
 class AdminHandle(Structure): # pylint: disable=too-few-public-methods
     """Admin handler"""
     _fields_ = [
@@ -76,16 +93,12 @@ class Client(object):
 
     def fs_format(self, medium_id, fs_type, unlock=False):
         """Format a medium through the LRS layer."""
-        fs_type = fs_type.lower()
-        if fs_type == 'ltfs':
-            rsc_family = PHO_RSC_TAPE
-            fs_type_enum = PHO_FS_LTFS
-        elif fs_type == 'posix':
-            rsc_family = PHO_RSC_DIR
-            fs_type_enum = PHO_FS_POSIX
-        else:
+        try:
+            rsc_family, fs_type_enum = FS_TYPES[fs_type.lower()]
+        except KeyError:
             raise EnvironmentError(errno.EOPNOTSUPP,
-                                   "Unknown filesystem type '%s'" % fs_type)
+                                   "Unknown filesystem type '%s'" %
+                                   fs_type) from None
 
         mstruct = Id(rsc_family, name=medium_id)
         rc = LIBPHOBOS_ADMIN.phobos_admin_format(byref(self.handle),
@@ -96,11 +109,10 @@ class Client(object):
 
     def device_add(self, dev_family, dev_names, keep_locked):
         """Add devices to the LRS."""
-        c_id = Id * len(dev_names)
-        dev_ids = [Id(dev_family, name=name) for name in dev_names]
+        dev_ids = _id_array(dev_family, dev_names)
 
         rc = LIBPHOBOS_ADMIN.phobos_admin_device_add(byref(self.handle),
-                                                     c_id(*dev_ids),
+                                                     dev_ids,
                                                      len(dev_ids), keep_locked)
         if rc:
             raise EnvironmentError(rc, "Error during device add")
@@ -114,22 +126,20 @@ class Client(object):
 
     def device_lock(self, dev_family, dev_names, is_forced):
         """Wrapper for the device lock command."""
-        c_id = Id * len(dev_names)
-        dev_ids = [Id(dev_family, name=name) for name in dev_names]
+        dev_ids = _id_array(dev_family, dev_names)
 
         rc = LIBPHOBOS_ADMIN.phobos_admin_device_lock(byref(self.handle),
-                                                      c_id(*dev_ids),
+                                                      dev_ids,
                                                       len(dev_ids), is_forced)
         if rc:
             raise EnvironmentError(rc, "Error during device lock")
 
     def device_unlock(self, dev_family, dev_names, is_forced):
         """Wrapper for the device unlock command."""
-        c_id = Id * len(dev_names)
-        dev_ids = [Id(dev_family, name=name) for name in dev_names]
+        dev_ids = _id_array(dev_family, dev_names)
 
         rc = LIBPHOBOS_ADMIN.phobos_admin_device_unlock(byref(self.handle),
-                                                        c_id(*dev_ids),
+                                                        dev_ids,
                                                         len(dev_ids),
                                                         is_forced)
         if rc:
@@ -142,11 +152,11 @@ class Client(object):
 
         enc_medium = medium.encode('utf-8') if medium else None
 
-        enc_res = [elt.encode('utf-8') for elt in res]
-        c_res_strlist = c_char_p * len(enc_res)
+        enc_res = (c_char_p * len(res))()
+        enc_res[:] = [elt.encode('utf-8') for elt in res]
 
         rc = LIBPHOBOS_ADMIN.phobos_admin_layout_list(byref(self.handle),
-                                                      c_res_strlist(*enc_res),
+                                                      enc_res,
                                                       len(enc_res),
                                                       is_pattern,
                                                       enc_medium,
@@ -156,21 +166,24 @@ class Client(object):
         if rc:
             raise EnvironmentError(rc)
 
-        if not degroup:
-            list_lyts = [layouts[i] for i in range(n_layouts.value)]
+        if not n_layouts.value:
+            list_lyts = []
+        elif not degroup:
+            # View on the C array, layouts are neither copied nor wrapped
+            # until they are actually displayed
+            list_lyts = (LayoutInfo * n_layouts.value).from_address(
+                cast(layouts, c_void_p).value)
         else:
             list_lyts = []
             for i in range(n_layouts.value):
-                ptr = layouts[i].extents
-                cnt = layouts[i].ext_count
-                for j in range(cnt):
-                    if medium is None or \
-                        medium in cast(ptr, POINTER(ExtentInfo))[j].media.name:
-                        lyt = type(layouts[i])()
-                        pointer(lyt)[0] = layouts[i]
+                layout = layouts[i]
+                extents = cast(layout.extents, POINTER(ExtentInfo))
+                for j in range(layout.ext_count):
+                    if medium is None or medium in extents[j].media.name:
+                        lyt = LayoutInfo()
+                        pointer(lyt)[0] = layout
                         lyt.ext_count = 1
-                        lyt.extents = addressof(cast(ptr,
-                                                     POINTER(ExtentInfo))[j])
+                        lyt.extents = addressof(extents[j])
                         list_lyts.append(lyt)
 
         return list_lyts, layouts, n_layouts
@@ -53,6 +53,11 @@ FILTER_OPERATORS = (
     ('__jexist', '$XJSON'),
 )
 
+# Separator for keys that may match any of several fields, eg. serial__or__path
+KEY_ALTERNATIVE_SEP = '__or__'
+# Suffix for keys that may match any of the values of a list, eg. id__in
+KEY_ANY_SUFFIX = '__in'
+
 OBJECT_PREFIXES = {
     'device': 'DSS::DEV::',
     'layout': 'DSS::EXT::',
@@ -76,24 +81,42 @@ def key_convert(obj_type, key):
             break
     return "%s%s" % (kname_prefx, kname), comp
 
+def key_criterion(obj_type, key, val):
+    """Build the CDSS criterion matching a single key against val."""
+    key, comp = key_convert(obj_type, key)
+    if comp is None:
+        # Implicit equal
+        return {key: val}
+    return {comp: {key: val}}
+
 def dss_filter(obj_type, **kwargs):
-    """Convert a k/v filter into a CDSS-compatible list of criteria."""
-    if len(kwargs) == 0:
+    """
+    Convert a k/v filter into a CDSS-compatible list of criteria.
+
+    A key made of several fields joined by KEY_ALTERNATIVE_SEP matches objects
+    for which any of these fields matches the value, or any of the values if a
+    list is given. A key ending with KEY_ANY_SUFFIX matches objects for which
+    the field matches any of the values.
+    """
+    if not kwargs:
         return None
     filt = JSONFilter()
     criteria = []
     for key, val in kwargs.items():
         if val is None:
             continue
-        key, comp = key_convert(obj_type, key)
         if not isinstance(val, list):
             val = [val]
+        any_of = key.endswith(KEY_ANY_SUFFIX)
+        if any_of:
+            key = key[:-len(KEY_ANY_SUFFIX)]
+        keys = key.split(KEY_ALTERNATIVE_SEP)
+        if any_of or len(keys) > 1:
+            criteria.append({'$OR': [key_criterion(obj_type, k, v)
+                                     for v in val for k in keys]})
+            continue
         for v in val:
-            if comp is None:
-                # Implicit equal
-                criteria.append({key: v})
-            else:
-                criteria.append({comp: {key: v}})
+            criteria.append(key_criterion(obj_type, key, v))
 
     assert len(criteria) > 0
 
@@ -207,15 +230,23 @@ class BaseEntityManager:
 
         return ret_items
 
+    def _c_array(self, objects):
+        """
+        Copy objects into a preallocated C array of the wrapped class, filled
+        in place rather than through the array constructor's varargs.
+        """
+        c_objs = (self.wrapped_class * len(objects))()
+        for i, elt in enumerate(objects):
+            c_objs[i] = elt
+        return c_objs
+
     def _generic_set(self, objects, opcode):
         """Common operation to wrap dss_{device,media,...}_set()"""
         if not objects:
             return
 
         obj_cnt = len(objects)
-        obj = (self.wrapped_class * obj_cnt)()
-        for i, elt in enumerate(objects):
-            obj[i] = elt
+        obj = self._c_array(objects)
 
         rc = self._dss_set(byref(self.client.handle), obj, obj_cnt, opcode)
         if rc:
@@ -240,7 +271,7 @@ class BaseEntityManager:
         lock_c_func could for example be dss_media_lock.
         """
         obj_count = len(objects)
-        obj_array = (self.wrapped_class * obj_count)(*objects)
+        obj_array = self._c_array(objects)
         rc = lock_c_func(byref(self.client.handle), lock_type, obj_array,
                          obj_count, lock_owner)
         if rc:
@@ -300,18 +331,25 @@ class MediaManager(BaseEntityManager):
 
     def add(self, media, fstype, tags=None):
         """Insert media into DSS."""
-        media.fs.type = str2fs_type(fstype)
-        media.addr_type = PHO_ADDR_HASH1
-        media.tags = tags or []
+        self.add_many([media], fstype, tags)
+
+    def add_many(self, media_list, fstype, tags=None):
+        """Insert several media into DSS within a single request."""
+        fs_type = str2fs_type(fstype)
+        for media in media_list:
+            media.fs.type = fs_type
+            media.addr_type = PHO_ADDR_HASH1
+            media.tags = tags or []
 
-        media.stats = MediaStats()
-        media.flags = OperationFlags()
+            media.stats = MediaStats()
+            media.flags = OperationFlags()
 
-        self.insert([media])
+        self.insert(media_list)
 
-        self.logger.debug("Media '%s' successfully added: "\
-                          "model=%s fs=%s (%s)",
-                          media.name, media.model, fstype, media.adm_status)
+        for media in media_list:
+            self.logger.debug("Media '%s' successfully added: "\
+                              "model=%s fs=%s (%s)",
+                              media.name, media.model, fstype, media.adm_status)
 
     def remove(self, family, name):
         """Delete media from DSS."""
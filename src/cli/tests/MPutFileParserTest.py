@@ -43,6 +43,7 @@ class CliTestMPutParser(unittest.TestCase):
         """Test valid strings for the mput file lines parser"""
         self._conv_check('a b c', ['a', 'b', 'c'])
         self._conv_check('a/b c -', ['a/b', 'c', '-'])
+        self._conv_check('a  b   c', ['a', 'b', 'c'])
         self._conv_check(r'a\ b c\ d e', ['a b', 'c d', 'e'])
         self._conv_check('"a b c" c "d e"', ['a b c', 'c', 'd e'])
         self._conv_check("a/b/'c d' 'd a' ab", ['a/b/c d', 'd a', 'ab'])
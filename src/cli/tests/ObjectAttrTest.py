@@ -50,6 +50,7 @@ class AttrConvertTest(unittest.TestCase):
         self._conv_check('a="",b=2,c=3', {'a':'', 'b':'2', 'c':'3'})
         self._conv_check('a="=",b="",c=3', {'a':'=', 'b':'', 'c':'3'})
         self._conv_check('', {})
+        self._conv_check('a==1,,b=2', {'a':'1', 'b':'2'})
 
     def test_invalid(self):
         """test invalid format and make sure they are detected as such."""
@@ -31,8 +31,10 @@ from contextlib import contextmanager
 from io import StringIO
 from socket import gethostname
 
-from phobos.cli import PhobosActionContext
-from phobos.core.dss import MediaManager
+from phobos.cli import PhobosActionContext, parse_set_access_flags
+from phobos.core.const import PHO_RSC_TAPE # pylint: disable=no-name-in-module
+from phobos.core.dss import Client as DSSClient, MediaManager
+from phobos.core.ffi import DevInfo, Id, Resource
 
 def gethostname_short():
     """Return short hostname"""
@@ -165,6 +167,19 @@ class CLIParametersTest(unittest.TestCase):
         self.check_cmdline_exit(['tape', 'locate'], code=2)
         self.check_cmdline_exit(['tape', 'locate', 'oid1', 'oid2'], code=2)
 
+    def test_set_access_flags(self):
+        """test media operation flags parsing."""
+        self.assertEqual(parse_set_access_flags(''), {})
+        self.assertEqual(parse_set_access_flags('GD'),
+                         {'put': False, 'get': True, 'delete': True})
+        self.assertEqual(parse_set_access_flags('+PG'),
+                         {'put': True, 'get': True})
+        self.assertEqual(parse_set_access_flags('-P'), {'put': False})
+        self.assertEqual(parse_set_access_flags('+'), {})
+        self.check_cmdline_valid(['dir', 'set-access', 'PGD', 'A'])
+        self.check_cmdline_valid(['tape', 'set-access', '--', '-P', 'A'])
+        self.check_cmdline_exit(['dir', 'set-access', '+PX', 'A'], code=2)
+
 
 class BasicExecutionTest(unittest.TestCase):
     """Base execution of the CLI."""
@@ -430,6 +445,34 @@ class DeviceAddTest(BasicExecutionTest):
         self.assertIn(file2.name, output)
 
 
+class DriveListTest(BasicExecutionTest):
+    """
+    This sub-test suite lists drives by serial or path and makes sure that
+    ambiguous identifiers are reported instead of listing an arbitrary drive.
+    """
+    def test_drive_list_shared_path(self):
+        """A path shared by several drives is ambiguous, serials are not."""
+        path = '/dev/test_shared_st0'
+        drives = [DevInfo(rsc=Resource(id=Id(PHO_RSC_TAPE,
+                                             name='TEST_SHARED_%s' % host),
+                                       model=''),
+                          path=path, host=host)
+                  for host in ('host_a', 'host_b')]
+
+        with DSSClient() as client:
+            client.devices.insert(drives)
+            try:
+                output, _ = self.pho_execute_capture(['drive', 'list', path],
+                                                     code=os.EX_USAGE)
+                self.assertEqual(output.strip(), '')
+
+                output, _ = self.pho_execute_capture(['drive', 'list',
+                                                      'TEST_SHARED_host_a'])
+                self.assertEqual(output.strip(), 'TEST_SHARED_host_a')
+            finally:
+                client.devices.delete(drives)
+
+
 class SyslogTest(BasicExecutionTest):
     """Syslog related tests"""
 
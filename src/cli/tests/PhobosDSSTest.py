@@ -129,6 +129,45 @@ class DSSClientTest(unittest.TestCase):
 
             client.devices.delete(res)
 
+    def test_get_serial_or_path(self):
+        """GET a device by either its serial or its path in a single query."""
+        with Client() as client:
+            rid = Id(PHO_RSC_DIR, name='__TEST_MAGIC_%d' % randint(0, 1000000))
+            dev = DevInfo(rsc=Resource(id=rid, model=''),
+                          path='/tmp/test_%d' % randint(0, 1000000),
+                          host='localhost')
+            client.devices.insert([dev])
+
+            for ident in (dev.rsc.id.name, dev.path):
+                res = client.devices.get(serial__or__path=ident)
+                self.assertEqual(len(res), 1)
+                self.assertEqual(res[0].rsc.id.name, dev.rsc.id.name)
+
+            res = client.devices.get(serial__or__path=[dev.path, '__NOPE__'])
+            self.assertEqual(len(res), 1)
+
+            client.devices.delete(res)
+
+    def test_add_many_media(self):
+        """Insert several media at once."""
+        with Client() as client:
+            names = ['/tmp/test_many_%d_%d' % (i, randint(0, 1000000))
+                     for i in range(3)]
+            client.media.add_many([MediaInfo(family=PHO_RSC_DIR, name=name,
+                                             model=None) for name in names],
+                                  'POSIX', tags=['many'])
+            try:
+                for name in names:
+                    media = client.media.get(id=name)
+                    self.assertEqual(len(media), 1)
+                    self.assertEqual(media[0].tags, ['many'])
+
+                self.assertEqual(len(client.media.get(id__in=names)),
+                                 len(names))
+            finally:
+                for name in names:
+                    client.media.remove(PHO_RSC_DIR, name)
+
     def test_add_sqli(self): # pylint: disable=no-self-use
         """The input data is sanitized and does not cause an SQL injection."""
         # Not the best place to test SQL escaping, but most convenient one.